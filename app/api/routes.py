@@ -1,13 +1,38 @@
+import datetime
+import hmac
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Request, HTTPException, status, Body
+from fastapi import APIRouter, Depends, Request, HTTPException, status, Body, Query
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.core.config import settings
+from app.db.session import get_db, get_audit_db
+from app.models.logs import ActionType
+from app.schemas.audit import AuditLogPage
 from app.schemas.secret import SecretCreate, SecretResponse, SecretRead, SecretDelete, PassphraseVerify
+from app.services import audit as audit_service
 from app.services import secret as secret_service
 
+audit_bearer = HTTPBearer(auto_error=False)
+
+
+def verify_audit_token(credentials: Optional[HTTPAuthorizationCredentials] = Depends(audit_bearer)):
+    if not settings.AUDIT_API_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Audit API is disabled"
+        )
+    if credentials is None or not hmac.compare_digest(credentials.credentials, settings.AUDIT_API_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid audit token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+
 secret_router = APIRouter()
+audit_router = APIRouter(dependencies=[Depends(verify_audit_token)])
 
 
 @secret_router.post(
@@ -52,4 +77,26 @@ async def delete_secret(
     db: Session = Depends(get_db)
 ):
     passphrase_value = passphrase_data.passphrase if passphrase_data else None
-    return secret_service.delete_secret(db, secret_key, passphrase_value, request) 
\ No newline at end of file
+    return secret_service.delete_secret(db, secret_key, passphrase_value, request) 
+
+
+@audit_router.get(
+    "",
+    response_model=AuditLogPage,
+    summary="Журнал аудита",
+    description="Возвращает записи аудита от новых к старым с фильтрами и курсорной пагинацией. "
+                "Требует токен оператора AUDIT_API_TOKEN. Ключи секретов возвращаются только в виде HMAC. "
+                "Запросы выполняются к реплике, если задан AUDIT_DATABASE_URL."
+)
+async def read_audit_logs(
+    action: Optional[ActionType] = Query(None, description="Тип операции"),
+    since: Optional[datetime.datetime] = Query(None, description="Начало интервала (включительно)"),
+    until: Optional[datetime.datetime] = Query(None, description="Конец интервала (не включительно)"),
+    ip_address: Optional[str] = Query(None, description="IP-адрес клиента"),
+    secret_key: Optional[str] = Query(None, description="Ключ секрета, сравнивается по HMAC"),
+    secret_key_hash: Optional[str] = Query(None, description="HMAC ключа секрета из предыдущего ответа"),
+    cursor: Optional[str] = Query(None, description="Курсор из предыдущего ответа"),
+    limit: int = Query(100, ge=1, le=settings.AUDIT_PAGE_SIZE_MAX, description="Размер страницы"),
+    db: Session = Depends(get_audit_db)
+):
+    return audit_service.query_logs(db, limit, action, since, until, ip_address, secret_key, secret_key_hash, cursor)
\ No newline at end of file
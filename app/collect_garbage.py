@@ -0,0 +1,46 @@
+import argparse
+import datetime
+import logging
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services import cache, dedup, expiry
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Стирает данные просроченных секретов и удаляет содержимое без ссылок. "
+                    "Запускается по расписанию, если EXPIRY_SCHEDULER_ENABLED выключен."
+    )
+    parser.add_argument("--batch-size", type=int, default=settings.EXPIRY_BATCH_SIZE, help="Размер пакета")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    log = logging.getLogger(__name__)
+
+    db = SessionLocal()
+    try:
+        now = datetime.datetime.now(datetime.timezone.utc)
+        scrubbed = 0
+        while True:
+            secret_keys = expiry.scrub_expired(db, now, args.batch_size)
+            for secret_key in secret_keys:
+                cache.delete_cache(secret_key)
+            scrubbed += len(secret_keys)
+            if len(secret_keys) < args.batch_size:
+                break
+
+        collected = 0
+        while True:
+            count = dedup.collect_orphans(db, args.batch_size)
+            collected += count
+            if count < args.batch_size:
+                break
+    finally:
+        db.close()
+
+    log.info(f"Стерто просроченных секретов: {scrubbed}, удалено содержимого: {collected}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,16 +12,47 @@ class Settings:
     POSTGRES_USER: str = os.getenv("POSTGRES_USER", "postgres")
     POSTGRES_PASSWORD: str = os.getenv("POSTGRES_PASSWORD", "postgres")
     
-    DATABASE_URL: str = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
+    DATABASE_URL: str = os.getenv("DATABASE_URL") or f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
+    
+    AUDIT_DATABASE_URL: str = os.getenv("AUDIT_DATABASE_URL") or DATABASE_URL
+    AUDIT_API_TOKEN: str = os.getenv("AUDIT_API_TOKEN", "")
+    AUDIT_PAGE_SIZE_MAX: int = int(os.getenv("AUDIT_PAGE_SIZE_MAX", "1000"))
     
     REDIS_HOST: str = os.getenv("REDIS_HOST", "localhost")
     REDIS_PORT: str = os.getenv("REDIS_PORT", "6379")
-    REDIS_URL: str = f"redis://{REDIS_HOST}:{REDIS_PORT}/0"
+    REDIS_URL: str = os.getenv("REDIS_URL") or f"redis://{REDIS_HOST}:{REDIS_PORT}/0"
+    
+    # memory — кеш в памяти процесса, redis — кеш в Redis по REDIS_URL
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory")
+    # database — таблица secret_logs, file — JSONL-файл, memory — буфер в памяти
+    AUDIT_SINK: str = os.getenv("AUDIT_SINK", "database")
+    AUDIT_SINK_PATH: str = os.getenv("AUDIT_SINK_PATH", "logs/audit.jsonl")
     
     SECRET_KEY: str = os.getenv("SECRET_KEY", "insecure_key_change_me")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     
     TTL_DEFAULT: int = int(os.getenv("TTL_DEFAULT", "3600"))
     CACHE_MIN_TTL: int = int(os.getenv("CACHE_MIN_TTL", "300"))
+    
+    DEDUP_ENABLED: bool = os.getenv("DEDUP_ENABLED", "false").lower() == "true"
+    DEDUP_ORPHAN_GRACE_SECONDS: int = int(os.getenv("DEDUP_ORPHAN_GRACE_SECONDS", "3600"))
+    
+    COMPRESSION_ENABLED: bool = os.getenv("COMPRESSION_ENABLED", "false").lower() == "true"
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    COMPRESSION_LEVEL: int = int(os.getenv("COMPRESSION_LEVEL", "6"))
+    COMPRESSION_MAX_EXPANDED_SIZE: int = int(os.getenv("COMPRESSION_MAX_EXPANDED_SIZE", str(16 * 1024 * 1024)))
+    
+    EXPIRY_SCHEDULER_ENABLED: bool = os.getenv("EXPIRY_SCHEDULER_ENABLED", "false").lower() == "true"
+    EXPIRY_TICK_SECONDS: int = int(os.getenv("EXPIRY_TICK_SECONDS", "1"))
+    EXPIRY_HORIZON_SECONDS: int = int(os.getenv("EXPIRY_HORIZON_SECONDS", "3600"))
+    EXPIRY_MAX_PENDING: int = int(os.getenv("EXPIRY_MAX_PENDING", "1000000"))
+    EXPIRY_BATCH_SIZE: int = int(os.getenv("EXPIRY_BATCH_SIZE", "1000"))
+    
+    TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+    TRACING_EXPORT_PATH: str = os.getenv("TRACING_EXPORT_PATH", "logs/traces.jsonl")
+    TRACING_PROFILE_ENABLED: bool = os.getenv("TRACING_PROFILE_ENABLED", "false").lower() == "true"
+    TRACING_PROFILE_THRESHOLD_MS: int = int(os.getenv("TRACING_PROFILE_THRESHOLD_MS", "500"))
+    TRACING_PROFILE_INTERVAL_MS: int = int(os.getenv("TRACING_PROFILE_INTERVAL_MS", "5"))
+    TRACING_PROFILE_PATH: str = os.getenv("TRACING_PROFILE_PATH", "logs/profiles.jsonl")
 
 settings = Settings() 
\ No newline at end of file
@@ -0,0 +1,301 @@
+import collections
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+SERVICE_NAME = "one-time-secrets"
+MAX_STATEMENT_LENGTH = 500
+
+
+class Trace:
+    def __init__(self, trace_id: Optional[str] = None):
+        if not is_valid_trace_id(trace_id):
+            trace_id = os.urandom(16).hex()
+        self.trace_id = trace_id
+        self.spans: List[Dict[str, Any]] = []
+
+
+def is_valid_trace_id(trace_id: Optional[str]) -> bool:
+    if not trace_id or len(trace_id) != 32:
+        return False
+    try:
+        int(trace_id, 16)
+    except ValueError:
+        return False
+    return True
+
+
+current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("current_trace", default=None)
+current_span_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_span_id", default=None)
+
+
+def get_trace_id() -> Optional[str]:
+    trace = current_trace.get()
+    return trace.trace_id if trace else None
+
+
+def record_span(
+    name: str,
+    start_ns: int,
+    end_ns: int,
+    attributes: Optional[Dict[str, Any]] = None,
+    span_id: Optional[str] = None,
+    parent_span_id: Optional[str] = None
+) -> None:
+    trace = current_trace.get()
+    if trace is None:
+        return
+    trace.spans.append({
+        "name": name,
+        "span_id": span_id or os.urandom(8).hex(),
+        "parent_span_id": parent_span_id if parent_span_id is not None else current_span_id.get(),
+        "start_ns": start_ns,
+        "end_ns": end_ns,
+        "attributes": attributes or {},
+    })
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes: Any):
+    if current_trace.get() is None:
+        yield
+        return
+
+    span_id = os.urandom(8).hex()
+    parent_span_id = current_span_id.get()
+    token = current_span_id.set(span_id)
+    start_ns = time.time_ns()
+    try:
+        yield
+    except Exception as e:
+        attributes["error"] = type(e).__name__
+        raise
+    finally:
+        current_span_id.reset(token)
+        record_span(name, start_ns, time.time_ns(), attributes, span_id, parent_span_id)
+
+
+def traced(name: str) -> Callable:
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            trace = current_trace.get()
+            if trace is None:
+                return func(*args, **kwargs)
+            if sampler is None:
+                with span(name):
+                    return func(*args, **kwargs)
+            with span(name), sampler.running(trace.trace_id):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_trace.get() is not None:
+        conn.info.setdefault("trace_query_start", []).append(time.time_ns())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("trace_query_start")
+    if current_trace.get() is None or not starts:
+        return
+    record_span("db.query", starts.pop(), time.time_ns(), {
+        "db.system": conn.dialect.name,
+        "db.statement": statement[:MAX_STATEMENT_LENGTH],
+    })
+
+
+class StackSampler:
+    """Статистический профилировщик для медленных запросов.
+
+    Один фоновый поток раз в TRACING_PROFILE_INTERVAL_MS снимает стеки потоков
+    и относит их к запросам дольше TRACING_PROFILE_THRESHOLD_MS. Асинхронные
+    запросы делят поток event loop, поэтому стек засчитывается запросу, только
+    пока поток выполняет его синхронный участок под @traced (сервисы, БД, кеш,
+    шифрование). Время в event loop, middleware и ожидании ввода-вывода ни к
+    какому запросу не относится и в профиль не попадает. Пока нет активных
+    запросов, поток спит на условии и не просыпается.
+    """
+
+    def __init__(self, threshold_ms: int, interval_ms: int):
+        self.threshold_ns = threshold_ms * 1_000_000
+        self.interval = interval_ms / 1000
+        self.active: Dict[str, Dict[str, Any]] = {}
+        # Какой запрос сейчас исполняется в каждом потоке
+        self.running_traces: Dict[int, str] = {}
+        self.condition = threading.Condition()
+        self.thread: Optional[threading.Thread] = None
+
+    def start_request(self, trace_id: str) -> None:
+        with self.condition:
+            self.active[trace_id] = {
+                "start_ns": time.time_ns(),
+                "stacks": collections.Counter(),
+            }
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="stack-sampler", daemon=True)
+                self.thread.start()
+            self.condition.notify()
+
+    def finish_request(self, trace_id: str) -> collections.Counter:
+        with self.condition:
+            request = self.active.pop(trace_id, None)
+        return request["stacks"] if request else collections.Counter()
+
+    @contextlib.contextmanager
+    def running(self, trace_id: str):
+        thread_id = threading.get_ident()
+        previous = self.running_traces.get(thread_id)
+        self.running_traces[thread_id] = trace_id
+        try:
+            yield
+        finally:
+            if previous is None:
+                self.running_traces.pop(thread_id, None)
+            else:
+                self.running_traces[thread_id] = previous
+
+    def run(self) -> None:
+        while True:
+            with self.condition:
+                while not self.active:
+                    self.condition.wait()
+            time.sleep(self.interval)
+            now = time.time_ns()
+            with self.condition:
+                slow = {
+                    trace_id: r for trace_id, r in self.active.items()
+                    if now - r["start_ns"] >= self.threshold_ns
+                }
+            if not slow:
+                continue
+            running = dict(self.running_traces)
+            frames = sys._current_frames()
+            for thread_id, trace_id in running.items():
+                request = slow.get(trace_id)
+                frame = frames.get(thread_id)
+                if request is not None and frame is not None:
+                    request["stacks"][fold_stack(frame)] += 1
+
+
+def fold_stack(frame) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def to_otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(trace: Trace) -> Dict[str, Any]:
+    spans = []
+    for s in trace.spans:
+        otlp_span = {
+            "traceId": trace.trace_id,
+            "spanId": s["span_id"],
+            "name": s["name"],
+            "kind": 1,
+            "startTimeUnixNano": str(s["start_ns"]),
+            "endTimeUnixNano": str(s["end_ns"]),
+            "attributes": [{"key": k, "value": to_otlp_value(v)} for k, v in s["attributes"].items()],
+        }
+        if s["parent_span_id"]:
+            otlp_span["parentSpanId"] = s["parent_span_id"]
+        spans.append(otlp_span)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+        }]
+    }
+
+
+class FileExporter:
+    """Пишет трейсы построчно в формате OTLP/JSON (совместим с otlpjsonfile)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record) + "\n"
+        with self.lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+
+exporter = FileExporter(settings.TRACING_EXPORT_PATH) if settings.TRACING_ENABLED else None
+profile_exporter = FileExporter(settings.TRACING_PROFILE_PATH) if settings.TRACING_PROFILE_ENABLED else None
+sampler = (
+    StackSampler(settings.TRACING_PROFILE_THRESHOLD_MS, settings.TRACING_PROFILE_INTERVAL_MS)
+    if settings.TRACING_PROFILE_ENABLED else None
+)
+
+
+def get_route_path(request) -> str:
+    path = request.url.path
+    for name, value in request.scope.get("path_params", {}).items():
+        path = path.replace(f"/{value}", f"/{{{name}}}", 1)
+    return path
+
+
+async def tracing_middleware(request, call_next):
+    if exporter is None:
+        return await call_next(request)
+
+    trace = Trace(request.headers.get("x-trace-id"))
+    token = current_trace.set(trace)
+    if sampler:
+        sampler.start_request(trace.trace_id)
+
+    status_code = 500
+    try:
+        with span(request.method, **{"http.method": request.method}):
+            response = await call_next(request)
+            status_code = response.status_code
+        response.headers["X-Trace-Id"] = trace.trace_id
+        return response
+    finally:
+        # Значения параметров пути заменяются их именами: в пути есть ключ секрета
+        root = trace.spans[-1]
+        root["name"] = f"{request.method} {get_route_path(request)}"
+        root["attributes"]["http.status_code"] = status_code
+        exporter.write(to_otlp(trace))
+        if sampler:
+            stacks = sampler.finish_request(trace.trace_id)
+            if stacks:
+                profile_exporter.write({
+                    "trace_id": trace.trace_id,
+                    "name": root["name"],
+                    "duration_ms": (root["end_ns"] - root["start_ns"]) / 1_000_000,
+                    "samples": sum(stacks.values()),
+                    "stacks": dict(stacks),
+                })
+        current_trace.reset(token)
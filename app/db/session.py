@@ -1,16 +1,42 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from app.core.config import settings
 
-engine = create_engine(settings.DATABASE_URL)
+
+def create_db_engine(url: str):
+    if url.startswith("sqlite"):
+        kwargs = {"connect_args": {"check_same_thread": False}}
+        if url in ("sqlite://", "sqlite:///:memory:"):
+            # Одно соединение на процесс, иначе каждое соединение видит свою пустую БД
+            kwargs["poolclass"] = StaticPool
+        return create_engine(url, **kwargs)
+    return create_engine(url)
+
+
+engine = create_db_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+if settings.AUDIT_DATABASE_URL == settings.DATABASE_URL:
+    audit_engine = engine
+else:
+    audit_engine = create_db_engine(settings.AUDIT_DATABASE_URL)
+AuditSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=audit_engine)
+
 
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+
+def get_audit_db():
+    db = AuditSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
\ No newline at end of file
@@ -0,0 +1,28 @@
+import argparse
+import datetime
+import logging
+
+from app.db.session import AuditSessionLocal
+from app.services.audit_export import WINDOWS, export_logs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Экспорт журнала аудита в сжатые JSONL-файлы")
+    parser.add_argument("output_dir", help="Каталог для файлов экспорта и водяного знака")
+    parser.add_argument("--window", choices=sorted(WINDOWS), default="hour", help="Временное окно одного файла")
+    parser.add_argument("--until", type=datetime.datetime.fromisoformat, default=None,
+                        help="Верхняя граница created_at (по умолчанию начало текущего окна)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Размер пакета при потоковом чтении")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    db = AuditSessionLocal()
+    try:
+        export_logs(db, args.output_dir, args.window, args.until, args.batch_size)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,35 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
-from app.api.routes import secret_router
+from app.api.routes import secret_router, audit_router
 from app.core.config import settings
-from app.db.session import engine
+from app.core.tracing import tracing_middleware
+from app.db.session import engine, SessionLocal
 from app.models import base
+from app.services import expiry
 
 base.Base.metadata.create_all(bind=engine)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.EXPIRY_SCHEDULER_ENABLED:
+        expiry.scheduler = expiry.ExpiryScheduler(SessionLocal)
+        expiry.scheduler.start()
+    yield
+    if expiry.scheduler is not None:
+        expiry.scheduler.stop()
+        expiry.scheduler = None
+
+
 app = FastAPI(
     title="Одноразовые секреты API",
     description="API для хранения и получения одноразовых секретов",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -31,7 +48,10 @@ async def add_no_cache_headers(request: Request, call_next):
     response.headers["Expires"] = "0"
     return response
 
+app.middleware("http")(tracing_middleware)
+
 app.include_router(secret_router, prefix="/secret", tags=["secrets"])
+app.include_router(audit_router, prefix="/audit", tags=["audit"])
 
 @app.get("/", tags=["health"])
 async def health_check():
@@ -1,3 +1,3 @@
 from app.models.base import Base
-from app.models.secret import Secret
-from app.models.logs import SecretLog 
\ No newline at end of file
+from app.models.secret import Secret, SecretContent
+from app.models.logs import SecretLog
\ No newline at end of file
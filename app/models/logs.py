@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Enum, ForeignKey
+from sqlalchemy import Column, String, Text, Enum, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 import enum
 import uuid
@@ -14,9 +14,14 @@ class ActionType(str, enum.Enum):
 
 class SecretLog(Base, TimeStampMixin):
     __tablename__ = "secret_logs"
+    __table_args__ = (
+        Index("ix_secret_logs_created_at_action", "created_at", "action"),
+        Index("ix_secret_logs_ip_address_created_at", "ip_address", "created_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     secret_key = Column(String, index=True, nullable=False)
+    secret_key_hash = Column(String, index=True, nullable=True)
     action = Column(Enum(ActionType), nullable=False)
     ip_address = Column(String, nullable=True)
     user_agent = Column(String, nullable=True)
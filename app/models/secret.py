@@ -1,23 +1,49 @@
 import datetime
-from sqlalchemy import Column, String, DateTime, Text, Boolean
+from sqlalchemy import Column, String, DateTime, Text, Boolean, Integer, ForeignKey, Index, text
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
 import uuid
 
 from app.models.base import Base, TimeStampMixin
 
 
+class SecretContent(Base, TimeStampMixin):
+    __tablename__ = "secret_contents"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    content_hash = Column(String, unique=True, index=True, nullable=False)
+    encrypted_data = Column(Text, nullable=False)
+    ref_count = Column(Integer, default=0, nullable=False)
+
+
 class Secret(Base, TimeStampMixin):
     __tablename__ = "secrets"
+    __table_args__ = (
+        Index(
+            "ix_secrets_expires_at_pending",
+            "expires_at",
+            postgresql_where=text("encrypted_data IS NOT NULL OR content_id IS NOT NULL"),
+            sqlite_where=text("encrypted_data IS NOT NULL OR content_id IS NOT NULL"),
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     secret_key = Column(String, unique=True, index=True, nullable=False)
-    encrypted_data = Column(Text, nullable=False)
+    encrypted_data = Column(Text, nullable=True)
+    content_id = Column(UUID(as_uuid=True), ForeignKey("secret_contents.id"), index=True, nullable=True)
     passphrase_hash = Column(String, nullable=True)
     is_accessed = Column(Boolean, default=False)
     is_deleted = Column(Boolean, default=False)
     expires_at = Column(DateTime(timezone=True), nullable=True)
 
+    content = relationship(SecretContent)
+
     def is_expired(self) -> bool:
         if self.expires_at is None:
             return False
-        return datetime.datetime.now(self.expires_at.tzinfo) >= self.expires_at 
\ No newline at end of file
+        return datetime.datetime.now(self.expires_at.tzinfo) >= self.expires_at
+
+    def get_encrypted_data(self) -> str:
+        if self.content is not None:
+            return self.content.encrypted_data
+        return self.encrypted_data
\ No newline at end of file
@@ -1 +1,2 @@
-from app.schemas.secret import SecretCreate, SecretResponse, SecretRead, SecretDelete 
\ No newline at end of file
+from app.schemas.secret import SecretCreate, SecretResponse, SecretRead, SecretDelete 
+from app.schemas.audit import AuditLogEntry, AuditLogPage
\ No newline at end of file
@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from app.models.logs import ActionType
+
+
+class AuditLogEntry(BaseModel):
+    id: UUID = Field(..., description="Идентификатор записи")
+    secret_key_hash: Optional[str] = Field(None, description="HMAC ключа секрета, сам ключ не раскрывается")
+    action: ActionType = Field(..., description="Тип операции")
+    ip_address: Optional[str] = Field(None, description="IP-адрес клиента")
+    user_agent: Optional[str] = Field(None, description="User-Agent клиента")
+    additional_data: Optional[str] = Field(None, description="Дополнительные данные в формате JSON")
+    created_at: datetime = Field(..., description="Время операции")
+
+    model_config = {"from_attributes": True}
+
+
+class AuditLogPage(BaseModel):
+    items: List[AuditLogEntry] = Field(..., description="Записи аудита")
+    next_cursor: Optional[str] = Field(None, description="Курсор следующей страницы")
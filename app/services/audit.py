@@ -0,0 +1,81 @@
+import base64
+import datetime
+import json
+import uuid
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.models.logs import SecretLog, ActionType
+from app.schemas.audit import AuditLogEntry, AuditLogPage
+from app.services import crypto
+
+
+def encode_cursor(log_entry: SecretLog) -> str:
+    payload = json.dumps({"c": log_entry.created_at.isoformat(), "i": str(log_entry.id)})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime.datetime, uuid.UUID]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.datetime.fromisoformat(payload["c"]), uuid.UUID(payload["i"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def query_logs(
+    db: Session,
+    limit: int,
+    action: Optional[ActionType] = None,
+    since: Optional[datetime.datetime] = None,
+    until: Optional[datetime.datetime] = None,
+    ip_address: Optional[str] = None,
+    secret_key: Optional[str] = None,
+    secret_key_hash: Optional[str] = None,
+    cursor: Optional[str] = None
+) -> AuditLogPage:
+    query = db.query(SecretLog)
+
+    if action:
+        query = query.filter(SecretLog.action == action)
+    if since:
+        query = query.filter(SecretLog.created_at >= since)
+    if until:
+        query = query.filter(SecretLog.created_at < until)
+    if ip_address:
+        query = query.filter(SecretLog.ip_address == ip_address)
+    if secret_key:
+        secret_key_hash = crypto.hash_secret_key(secret_key)
+    if secret_key_hash:
+        query = query.filter(SecretLog.secret_key_hash == secret_key_hash)
+
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        query = query.filter(
+            or_(
+                SecretLog.created_at < cursor_created_at,
+                and_(SecretLog.created_at == cursor_created_at, SecretLog.id < cursor_id)
+            )
+        )
+
+    rows = (
+        query.order_by(SecretLog.created_at.desc(), SecretLog.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1])
+
+    return AuditLogPage(
+        items=[AuditLogEntry.model_validate(row) for row in rows],
+        next_cursor=next_cursor
+    )
@@ -0,0 +1,153 @@
+import datetime
+import gzip
+import json
+import os
+import uuid
+from typing import Any, Dict, Optional
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+
+from app.models.logs import SecretLog
+
+import logging
+log = logging.getLogger(__name__)
+
+WATERMARK_FILE = "watermark.json"
+
+WINDOWS = {
+    "hour": datetime.timedelta(hours=1),
+    "day": datetime.timedelta(days=1),
+}
+
+EXPORT_COLUMNS = (
+    SecretLog.id,
+    SecretLog.secret_key_hash,
+    SecretLog.action,
+    SecretLog.ip_address,
+    SecretLog.user_agent,
+    SecretLog.additional_data,
+    SecretLog.created_at,
+)
+
+
+def window_start(moment: datetime.datetime, window: str) -> datetime.datetime:
+    if window == "day":
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def window_file_name(start: datetime.datetime, window: str) -> str:
+    fmt = "%Y%m%d" if window == "day" else "%Y%m%dT%H"
+    return f"secret_logs_{start.strftime(fmt)}.jsonl.gz"
+
+
+def read_watermark(output_dir: str) -> Optional[Dict[str, Any]]:
+    path = os.path.join(output_dir, WATERMARK_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        data = json.load(f)
+    return {
+        "created_at": datetime.datetime.fromisoformat(data["created_at"]),
+        "id": uuid.UUID(data["id"]),
+        "file": data.get("file"),
+        "size": data.get("size"),
+    }
+
+
+def write_watermark(output_dir: str, created_at: datetime.datetime, log_id: uuid.UUID, file_name: str) -> None:
+    path = os.path.join(output_dir, WATERMARK_FILE)
+    size = os.path.getsize(os.path.join(output_dir, file_name))
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"created_at": created_at.isoformat(), "id": str(log_id), "file": file_name, "size": size}, f)
+    os.replace(tmp_path, path)
+
+
+def open_window_file(output_dir: str, file_name: str, watermark: Optional[Dict[str, Any]]):
+    path = os.path.join(output_dir, file_name)
+    if watermark and watermark["file"] == file_name and os.path.exists(path):
+        # Окно уже частично выгружено (например, с --until посреди окна):
+        # отбрасываем незафиксированный хвост и дописываем новый gzip-member
+        os.truncate(path, watermark["size"])
+        return gzip.open(path, "at", encoding="utf-8")
+    return gzip.open(path, "wt", encoding="utf-8")
+
+
+def export_logs(
+    db: Session,
+    output_dir: str,
+    window: str = "hour",
+    until: Optional[datetime.datetime] = None,
+    batch_size: int = 1000
+) -> int:
+    """Выгружает secret_logs в сжатые JSONL-файлы, по файлу на временное окно.
+
+    Строки читаются потоково, поэтому потребление памяти не зависит от размера
+    таблицы. Водяной знак обновляется после закрытия каждого файла, и повторный
+    запуск продолжает с места остановки: если окно было выгружено частично,
+    файл дописывается, а не перезаписывается. По умолчанию выгружаются только
+    завершенные окна.
+    """
+    if window not in WINDOWS:
+        raise ValueError(f"Неизвестное окно: {window}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    if until is None:
+        until = window_start(datetime.datetime.now(datetime.timezone.utc), window)
+
+    stmt = select(*EXPORT_COLUMNS).where(SecretLog.created_at < until)
+    watermark = read_watermark(output_dir)
+    if watermark:
+        created_at, log_id = watermark["created_at"], watermark["id"]
+        stmt = stmt.where(
+            or_(
+                SecretLog.created_at > created_at,
+                and_(SecretLog.created_at == created_at, SecretLog.id > log_id)
+            )
+        )
+    stmt = stmt.order_by(SecretLog.created_at, SecretLog.id)
+
+    result = db.execute(stmt.execution_options(yield_per=batch_size))
+
+    exported = 0
+    current_window = None
+    current_file = None
+    current_name = None
+    last_row = None
+    try:
+        for row in result:
+            row_window = window_start(row.created_at, window)
+            if row_window != current_window:
+                if current_file:
+                    current_file.close()
+                    write_watermark(output_dir, last_row.created_at, last_row.id, current_name)
+                current_window = row_window
+                current_name = window_file_name(row_window, window)
+                current_file = open_window_file(output_dir, current_name, watermark)
+                log.info(f"Экспорт аудита в {os.path.join(output_dir, current_name)}")
+
+            current_file.write(json.dumps({
+                "id": str(row.id),
+                "secret_key_hash": row.secret_key_hash,
+                "action": row.action.value,
+                "ip_address": row.ip_address,
+                "user_agent": row.user_agent,
+                "additional_data": row.additional_data,
+                "created_at": row.created_at.isoformat(),
+            }) + "\n")
+            last_row = row
+            exported += 1
+
+        if current_file:
+            current_file.close()
+            current_file = None
+            write_watermark(output_dir, last_row.created_at, last_row.id, current_name)
+    finally:
+        if current_file:
+            current_file.close()
+        result.close()
+
+    log.info(f"Экспортировано записей аудита: {exported}")
+    return exported
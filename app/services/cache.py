@@ -3,37 +3,76 @@ import time
 from typing import Optional, Any, Dict, Union
 
 from app.core.config import settings
+from app.core.tracing import traced
 
-local_cache = {}
-cache_expire_times = {}
+
+class MemoryCacheBackend:
+    def __init__(self):
+        self.local_cache = {}
+        self.cache_expire_times = {}
+
+    def set(self, cache_key: str, value: str, ttl: int) -> None:
+        self.local_cache[cache_key] = value
+        self.cache_expire_times[cache_key] = time.time() + ttl
+
+    def get(self, cache_key: str) -> Optional[str]:
+        if cache_key in self.local_cache and cache_key in self.cache_expire_times:
+            if time.time() < self.cache_expire_times[cache_key]:
+                return self.local_cache[cache_key]
+            self.delete(cache_key)
+        return None
+
+    def delete(self, cache_key: str) -> None:
+        self.local_cache.pop(cache_key, None)
+        self.cache_expire_times.pop(cache_key, None)
+
+
+class RedisCacheBackend:
+    def __init__(self, url: str):
+        import redis
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+
+    def set(self, cache_key: str, value: str, ttl: int) -> None:
+        self.client.set(cache_key, value, ex=ttl)
+
+    def get(self, cache_key: str) -> Optional[str]:
+        return self.client.get(cache_key)
+
+    def delete(self, cache_key: str) -> None:
+        self.client.delete(cache_key)
+
+
+def create_backend() -> Union[MemoryCacheBackend, RedisCacheBackend]:
+    if settings.CACHE_BACKEND == "memory":
+        return MemoryCacheBackend()
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCacheBackend(settings.REDIS_URL)
+    raise ValueError(f"Неизвестный бэкенд кеша: {settings.CACHE_BACKEND}")
+
+
+backend = create_backend()
 
 
 def get_cache_key(key: str) -> str:
     return f"secret:{key}"
 
 
+@traced("cache.set")
 def set_cache(key: str, data: Dict[str, Any], ttl_seconds: Optional[int] = None) -> None:
     cache_key = get_cache_key(key)
     ttl = max(ttl_seconds or 0, settings.CACHE_MIN_TTL)
-    
-    local_cache[cache_key] = json.dumps(data)
-    cache_expire_times[cache_key] = time.time() + ttl
+
+    backend.set(cache_key, json.dumps(data), ttl)
 
 
+@traced("cache.get")
 def get_cache(key: str) -> Optional[Dict[str, Any]]:
-    cache_key = get_cache_key(key)
-    
-    if cache_key in local_cache and cache_key in cache_expire_times:
-        if time.time() < cache_expire_times[cache_key]:
-            return json.loads(local_cache[cache_key])
-        else:
-            delete_cache(key)
-    return None
+    cached = backend.get(get_cache_key(key))
+    if cached is None:
+        return None
+    return json.loads(cached)
 
 
+@traced("cache.delete")
 def delete_cache(key: str) -> None:
-    cache_key = get_cache_key(key)
-    if cache_key in local_cache:
-        local_cache.pop(cache_key, None)
-    if cache_key in cache_expire_times:
-        cache_expire_times.pop(cache_key, None) 
\ No newline at end of file
+    backend.delete(get_cache_key(key))
@@ -1,11 +1,13 @@
 import base64
 import os
+import zlib
 from typing import Optional
 
 from cryptography.fernet import Fernet
 import logging
 
 from app.core.config import settings
+from app.core.tracing import traced
 
 log = logging.getLogger(__name__)
 
@@ -16,6 +18,10 @@ def get_encryption_key():
 
 fernet = Fernet(get_encryption_key())
 
+# Токены Fernet всегда начинаются с "gAAAAA", поэтому префикс однозначно
+# отличает сжатые записи от старых несжатых
+COMPRESSED_PREFIX = "z1:"
+
 def generate_secret_key() -> str:
     return base64.urlsafe_b64encode(os.urandom(32)).decode()
 
@@ -27,16 +33,55 @@ def hash_passphrase(passphrase: str) -> str:
 def verify_passphrase(plain_passphrase: str, hashed_passphrase: str) -> bool:
     return hash_passphrase(plain_passphrase) == hashed_passphrase
 
+def hash_secret_key(secret_key: str) -> str:
+    import hmac
+    from hashlib import sha256
+    mac_key = hmac.new(settings.SECRET_KEY.encode(), b"secret-key-audit", sha256).digest()
+    return hmac.new(mac_key, secret_key.encode(), sha256).hexdigest()
+
+def hash_content(data: str) -> str:
+    import hmac
+    from hashlib import sha256
+    mac_key = hmac.new(settings.SECRET_KEY.encode(), b"secret-content-dedup", sha256).digest()
+    return hmac.new(mac_key, data.encode(), sha256).hexdigest()
+
+def compress_data(raw: bytes) -> Optional[bytes]:
+    if not settings.COMPRESSION_ENABLED or len(raw) < settings.COMPRESSION_MIN_SIZE:
+        return None
+    compressed = zlib.compress(raw, settings.COMPRESSION_LEVEL)
+    if len(compressed) >= len(raw):
+        return None
+    return compressed
+
+def decompress_data(compressed: bytes) -> bytes:
+    max_size = settings.COMPRESSION_MAX_EXPANDED_SIZE
+    decompressor = zlib.decompressobj()
+    raw = decompressor.decompress(compressed, max_size + 1)
+    if len(raw) > max_size or decompressor.unconsumed_tail:
+        raise ValueError(f"Размер распакованных данных превышает {max_size} байт")
+    if not decompressor.eof:
+        raise ValueError("Сжатые данные повреждены или неполны")
+    return raw
+
+@traced("crypto.encrypt")
 def encrypt_data(data: str, passphrase: Optional[str] = None) -> str:
     try:
-        encrypted_data = fernet.encrypt(data.encode())
+        raw = data.encode()
+        compressed = compress_data(raw)
+        if compressed is not None:
+            return COMPRESSED_PREFIX + fernet.encrypt(compressed).decode()
+        encrypted_data = fernet.encrypt(raw)
         return encrypted_data.decode()
     except Exception as e:
         log.error(f"Ошибка шифрования: {str(e)}")
         raise
 
+@traced("crypto.decrypt")
 def decrypt_data(encrypted_data: str, passphrase: Optional[str] = None) -> str:
     try:
+        if encrypted_data.startswith(COMPRESSED_PREFIX):
+            compressed = fernet.decrypt(encrypted_data[len(COMPRESSED_PREFIX):].encode())
+            return decompress_data(compressed).decode()
         decrypted_data = fernet.decrypt(encrypted_data.encode())
         return decrypted_data.decode()
     except Exception as e:
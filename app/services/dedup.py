@@ -0,0 +1,114 @@
+from typing import Dict, Optional
+import datetime
+import uuid
+
+from sqlalchemy import exists, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.secret import Secret, SecretContent
+from app.services import crypto
+
+import logging
+log = logging.getLogger(__name__)
+
+
+def get_insert(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    raise ValueError(f"Дедупликация не поддерживается для {dialect}")
+
+
+def acquire_content(db: Session, data: str) -> SecretContent:
+    content_hash = crypto.hash_content(data)
+
+    content_id = db.execute(
+        update(SecretContent)
+        .where(SecretContent.content_hash == content_hash)
+        .values(ref_count=SecretContent.ref_count + 1)
+        .returning(SecretContent.id)
+    ).scalar_one_or_none()
+
+    if content_id is None:
+        # Параллельный запрос мог вставить то же содержимое: upsert вместо INSERT
+        insert = get_insert(db)
+        stmt = insert(SecretContent).values(
+            id=uuid.uuid4(),
+            content_hash=content_hash,
+            encrypted_data=crypto.encrypt_data(data),
+            ref_count=1
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SecretContent.content_hash],
+            set_={"ref_count": SecretContent.ref_count + 1}
+        ).returning(SecretContent.id)
+        content_id = db.execute(stmt).scalar_one()
+        log.info(f"Сохранено содержимое {content_id}")
+    else:
+        log.info(f"Используем существующее содержимое {content_id}")
+
+    return db.get(SecretContent, content_id, populate_existing=True)
+
+
+def release_content(db: Session, secret: Secret) -> None:
+    if secret.content_id is None:
+        return
+
+    content_id = secret.content_id
+    # Ссылку снимает только тот, кто реально ее обнулил: повторное или
+    # параллельное освобождение не уменьшит счетчик дважды
+    released = db.query(Secret).filter(
+        Secret.id == secret.id,
+        Secret.content_id == content_id
+    ).update({Secret.content_id: None}, synchronize_session=False)
+    db.expire(secret, ["content_id", "content"])
+
+    if released != 1:
+        return
+    release_contents(db, {content_id: 1})
+
+
+def release_contents(db: Session, counts: Dict[uuid.UUID, int]) -> None:
+    for content_id, count in counts.items():
+        db.query(SecretContent).filter(SecretContent.id == content_id).update(
+            {SecretContent.ref_count: SecretContent.ref_count - count},
+            synchronize_session=False
+        )
+    if counts:
+        referenced = exists().where(Secret.content_id == SecretContent.id)
+        deleted = db.query(SecretContent).filter(
+            SecretContent.id.in_(list(counts)),
+            SecretContent.ref_count <= 0,
+            ~referenced
+        ).delete(synchronize_session=False)
+        if deleted:
+            log.info(f"Удалено записей содержимого без ссылок: {deleted}")
+
+
+def collect_orphans(db: Session, limit: Optional[int] = None) -> int:
+    # Свежие записи не трогаем: их ссылка может быть еще не закоммичена
+    cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(
+        seconds=settings.DEDUP_ORPHAN_GRACE_SECONDS
+    )
+    referenced = exists().where(Secret.content_id == SecretContent.id)
+    query = db.query(SecretContent.id).filter(~referenced, SecretContent.updated_at < cutoff)
+    if limit:
+        query = query.limit(limit)
+
+    orphan_ids = [row.id for row in query.all()]
+    if not orphan_ids:
+        return 0
+
+    deleted = db.query(SecretContent).filter(
+        SecretContent.id.in_(orphan_ids),
+        ~referenced
+    ).delete(synchronize_session=False)
+    db.commit()
+
+    log.info(f"Удалено осиротевших записей содержимого: {deleted}")
+    return deleted
@@ -0,0 +1,281 @@
+import collections
+import datetime
+import math
+import threading
+import time
+from typing import Callable, List, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.secret import Secret
+from app.services import cache, dedup
+
+import logging
+log = logging.getLogger(__name__)
+
+
+class TimingWheel:
+    """Колесо таймеров с фиксированным числом слотов.
+
+    Добавление и извлечение стоят O(1) на запись. Колесо покрывает только
+    ближайший горизонт: записи дальше горизонта не добавляются и подгружаются
+    из БД по мере его продвижения.
+    """
+
+    def __init__(self, tick_seconds: int, slots: int, now: float):
+        self.tick_seconds = tick_seconds
+        self.slots: List[List[str]] = [[] for _ in range(slots)]
+        self.current_tick = int(now // tick_seconds)
+        self.size = 0
+
+    @property
+    def horizon_end(self) -> float:
+        return (self.current_tick + len(self.slots)) * self.tick_seconds
+
+    def add(self, key: str, expires_ts: float) -> bool:
+        # Слот округляется вверх, чтобы запись никогда не срабатывала раньше срока
+        tick = max(math.ceil(expires_ts / self.tick_seconds), self.current_tick)
+        if tick >= self.current_tick + len(self.slots):
+            return False
+        self.slots[tick % len(self.slots)].append(key)
+        self.size += 1
+        return True
+
+    def advance(self, now: float) -> List[str]:
+        due = []
+        target = int(now // self.tick_seconds)
+        # После долгого простоя достаточно одного полного оборота
+        if target - self.current_tick >= len(self.slots):
+            self.current_tick = target - len(self.slots) + 1
+        while self.current_tick <= target:
+            slot = self.slots[self.current_tick % len(self.slots)]
+            if slot:
+                due.extend(slot)
+                self.size -= len(slot)
+                slot.clear()
+            self.current_tick += 1
+        return due
+
+
+class ExpiryScheduler:
+    """Проактивно удаляет просроченные секреты из кеша и стирает шифротекст в БД.
+
+    В памяти хранятся только ключи секретов, истекающих в пределах
+    EXPIRY_HORIZON_SECONDS, но не больше EXPIRY_MAX_PENDING. Остальные
+    секреты ждут в БД и подгружаются по индексу expires_at, поэтому память
+    ограничена независимо от общего числа ожидающих секретов. Строки,
+    пропущенные колесом (например, при перезапуске), находит пакетный
+    проход по тому же индексу. Индекс частичный: в него входят только строки
+    с еще не стертыми данными, поэтому проходы не перечитывают историю.
+
+    Ключи, не поместившиеся в колесо из-за EXPIRY_MAX_PENDING, запоминаются
+    сроком: пока он не покрыт проходом, проход выполняется на каждом тике, и
+    такие секреты стираются с опозданием не больше EXPIRY_TICK_SECONDS.
+    Секреты, созданные во время подгрузки окна, ловит плановый проход, который
+    выполняется каждые EXPIRY_HORIZON_SECONDS / 2. Ключи, стертые проходом,
+    тоже удаляются из кеша.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session]):
+        self.session_factory = session_factory
+        self.tick_seconds = settings.EXPIRY_TICK_SECONDS
+        self.horizon_seconds = settings.EXPIRY_HORIZON_SECONDS
+        self.max_pending = settings.EXPIRY_MAX_PENDING
+        self.batch_size = settings.EXPIRY_BATCH_SIZE
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.wheel: Optional[TimingWheel] = None
+        self.loaded_until = 0.0
+        self.swept_until: Optional[float] = None
+        # Самый поздний срок среди ключей, которые не поместились в колесо
+        self.overflow_until: Optional[float] = None
+
+    def rebuild(self, now: Optional[float] = None) -> None:
+        now = now if now is not None else time.time()
+        slots = max(1, math.ceil(self.horizon_seconds / self.tick_seconds))
+        with self.lock:
+            self.wheel = TimingWheel(self.tick_seconds, slots, now)
+            self.loaded_until = now
+
+        db = self.session_factory()
+        try:
+            self.sweep(db, now)
+            self.refill(db)
+        finally:
+            db.close()
+        log.info(f"Планировщик истечения загружен: {self.wheel.size} секретов")
+
+    def schedule(self, secret_key: str, expires_at: datetime.datetime) -> None:
+        expires_ts = expires_at.timestamp()
+        with self.lock:
+            if self.wheel is None or expires_ts >= self.loaded_until:
+                return
+            if self.wheel.size < self.max_pending:
+                self.wheel.add(secret_key, expires_ts)
+            else:
+                self.overflow_until = max(self.overflow_until or expires_ts, expires_ts)
+
+    def refill(self, db: Session) -> None:
+        with self.lock:
+            start = self.loaded_until
+            end = self.wheel.horizon_end
+            limit = self.max_pending - self.wheel.size
+        if start >= end or limit <= 0:
+            return
+
+        rows = (
+            db.query(Secret.secret_key, Secret.expires_at)
+            .filter(
+                Secret.expires_at >= to_datetime(start),
+                Secret.expires_at < to_datetime(end),
+                or_(Secret.encrypted_data.isnot(None), Secret.content_id.isnot(None)),
+            )
+            .order_by(Secret.expires_at)
+            .limit(limit)
+            .all()
+        )
+
+        with self.lock:
+            for row in rows:
+                self.wheel.add(row.secret_key, as_utc(row.expires_at).timestamp())
+            # При упоре в лимит догружаем с последнего срока; повторы безвредны
+            self.loaded_until = as_utc(rows[-1].expires_at).timestamp() if len(rows) == limit else end
+
+    def sweep(self, db: Session, now: float) -> int:
+        # Каждая строка попадает ровно в одно окно (swept_until, now]
+        since = to_datetime(self.swept_until) if self.swept_until is not None else None
+        scrubbed = 0
+        while True:
+            secret_keys = scrub_expired(db, to_datetime(now), self.batch_size, since=since)
+            # Эти ключи могли не попасть в колесо, поэтому кеш чистится здесь
+            for secret_key in secret_keys:
+                cache.delete_cache(secret_key)
+            scrubbed += len(secret_keys)
+            if len(secret_keys) < self.batch_size:
+                break
+        self.swept_until = now
+        with self.lock:
+            if self.overflow_until is not None and self.overflow_until <= now:
+                self.overflow_until = None
+        return scrubbed
+
+    def run_once(self, now: Optional[float] = None) -> int:
+        now = now if now is not None else time.time()
+        with self.lock:
+            if self.wheel is None:
+                return 0
+            due = self.wheel.advance(now)
+
+        for secret_key in due:
+            cache.delete_cache(secret_key)
+
+        scrubbed = 0
+        db = self.session_factory()
+        try:
+            for i in range(0, len(due), self.batch_size):
+                scrubbed += len(scrub_expired(db, to_datetime(now), self.batch_size, due[i:i + self.batch_size]))
+            if self.overflow_until is not None:
+                # Ключи, вытесненные из колеса, стираются проходом на ближайшем тике
+                scrubbed += self.sweep(db, now)
+            if self.loaded_until - now < self.horizon_seconds / 2:
+                # Страховочный проход по индексу: секреты, созданные во время
+                # подгрузки, могли не попасть в колесо
+                scrubbed += self.sweep(db, now)
+                self.refill(db)
+                dedup.collect_orphans(db, self.batch_size)
+        finally:
+            db.close()
+
+        if due or scrubbed:
+            log.info(f"Истекло секретов: {len(due)}, стерто в БД: {scrubbed}")
+        return len(due)
+
+    def start(self) -> None:
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name="expiry-scheduler", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    def run(self) -> None:
+        # Начальный проход по БД выполняется в потоке планировщика и не
+        # задерживает запуск приложения
+        try:
+            self.rebuild()
+        except Exception as e:
+            log.error(f"Ошибка загрузки планировщика истечения: {str(e)}")
+            return
+        while not self.stop_event.wait(self.tick_seconds):
+            try:
+                self.run_once()
+            except Exception as e:
+                log.error(f"Ошибка планировщика истечения: {str(e)}")
+
+
+def scrub_expired(
+    db: Session,
+    now: datetime.datetime,
+    limit: int,
+    secret_keys: Optional[List[str]] = None,
+    since: Optional[datetime.datetime] = None
+) -> List[str]:
+    query = db.query(Secret.id, Secret.secret_key, Secret.content_id).filter(
+        Secret.expires_at <= now,
+        or_(Secret.encrypted_data.isnot(None), Secret.content_id.isnot(None))
+    )
+    if since is not None:
+        query = query.filter(Secret.expires_at > since)
+    if secret_keys is not None:
+        query = query.filter(Secret.secret_key.in_(secret_keys))
+    rows = query.order_by(Secret.expires_at).limit(limit).all()
+    if not rows:
+        return []
+
+    by_content = collections.defaultdict(list)
+    for row in rows:
+        if row.content_id:
+            by_content[row.content_id].append(row.id)
+
+    # Счетчик уменьшается только на число строк, которые этот вызов реально
+    # отвязал: параллельный планировщик или чтение секрета уже могли это сделать
+    released = {}
+    for content_id, secret_ids in by_content.items():
+        count = db.query(Secret).filter(
+            Secret.id.in_(secret_ids),
+            Secret.content_id == content_id
+        ).update({Secret.content_id: None}, synchronize_session=False)
+        if count:
+            released[content_id] = count
+
+    db.query(Secret).filter(
+        Secret.id.in_([row.id for row in rows]),
+        Secret.encrypted_data.isnot(None)
+    ).update({Secret.encrypted_data: None}, synchronize_session=False)
+    dedup.release_contents(db, released)
+    db.commit()
+    return [row.secret_key for row in rows]
+
+
+def to_datetime(ts: float) -> datetime.datetime:
+    return datetime.datetime.fromtimestamp(ts, datetime.timezone.utc)
+
+
+def as_utc(value: datetime.datetime) -> datetime.datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=datetime.timezone.utc)
+    return value
+
+
+scheduler: Optional[ExpiryScheduler] = None
+
+
+def schedule(secret_key: str, expires_at: datetime.datetime) -> None:
+    if scheduler is not None:
+        scheduler.schedule(secret_key, expires_at)
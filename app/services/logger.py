@@ -1,12 +1,75 @@
+import collections
 import json
-from typing import Dict, Any, Optional
+import os
+import threading
+import uuid
+from typing import Dict, Any, Optional, Union
 
 from fastapi import Request
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.core.tracing import traced
+from app.models.base import utcnow
 from app.models.logs import SecretLog, ActionType
+from app.services import crypto
 
 
+class DatabaseAuditSink:
+    def write(self, db: Session, log_entry: SecretLog) -> None:
+        db.add(log_entry)
+        db.commit()
+
+
+class FileAuditSink:
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def write(self, db: Session, log_entry: SecretLog) -> None:
+        line = json.dumps(entry_to_dict(log_entry)) + "\n"
+        with self.lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+
+class MemoryAuditSink:
+    def __init__(self, max_entries: int = 100_000):
+        self.entries = collections.deque(maxlen=max_entries)
+
+    def write(self, db: Session, log_entry: SecretLog) -> None:
+        self.entries.append(entry_to_dict(log_entry))
+
+
+def entry_to_dict(log_entry: SecretLog) -> Dict[str, Any]:
+    return {
+        "id": str(log_entry.id),
+        "secret_key_hash": log_entry.secret_key_hash,
+        "action": log_entry.action.value,
+        "ip_address": log_entry.ip_address,
+        "user_agent": log_entry.user_agent,
+        "additional_data": log_entry.additional_data,
+        "created_at": log_entry.created_at.isoformat(),
+    }
+
+
+def create_sink() -> Union[DatabaseAuditSink, FileAuditSink, MemoryAuditSink]:
+    if settings.AUDIT_SINK == "database":
+        return DatabaseAuditSink()
+    if settings.AUDIT_SINK == "file":
+        return FileAuditSink(settings.AUDIT_SINK_PATH)
+    if settings.AUDIT_SINK == "memory":
+        return MemoryAuditSink()
+    raise ValueError(f"Неизвестный приемник аудита: {settings.AUDIT_SINK}")
+
+
+sink = create_sink()
+
+
+@traced("logger.log_action")
 def log_action(
     db: Session,
     secret_key: str,
@@ -15,14 +78,16 @@ def log_action(
     additional_data: Optional[Dict[str, Any]] = None
 ) -> None:
     log_entry = SecretLog(
+        id=uuid.uuid4(),
         secret_key=secret_key,
+        secret_key_hash=crypto.hash_secret_key(secret_key),
         action=action,
-        additional_data=json.dumps(additional_data) if additional_data else None
+        additional_data=json.dumps(additional_data) if additional_data else None,
+        created_at=utcnow()
     )
-    
+
     if request:
         log_entry.ip_address = request.client.host if request.client else None
         log_entry.user_agent = request.headers.get("user-agent")
-    
-    db.add(log_entry)
-    db.commit() 
\ No newline at end of file
+
+    sink.write(db, log_entry)
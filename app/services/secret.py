@@ -7,13 +7,16 @@ from sqlalchemy.orm import Session
 from app.models.logs import ActionType
 from app.models.secret import Secret
 from app.schemas.secret import SecretCreate, SecretResponse, SecretRead, SecretDelete
-from app.services import crypto, cache, logger
+from app.core.config import settings
+from app.core.tracing import traced
+from app.services import crypto, cache, logger, dedup, expiry
 
 import logging
 logging.basicConfig(level=logging.INFO)
 log = logging.getLogger(__name__)
 
 
+@traced("secret_service.create_secret")
 def create_secret(
     db: Session,
     secret_data: SecretCreate,
@@ -23,7 +26,12 @@ def create_secret(
     
     log.info(f"Создаем секрет с ключом: {secret_key}")
     
-    encrypted_data = crypto.encrypt_data(secret_data.secret, secret_data.passphrase)
+    content = None
+    if settings.DEDUP_ENABLED:
+        content = dedup.acquire_content(db, secret_data.secret)
+        encrypted_data = content.encrypted_data
+    else:
+        encrypted_data = crypto.encrypt_data(secret_data.secret, secret_data.passphrase)
     
     passphrase_hash = None
     if secret_data.passphrase:
@@ -39,7 +47,8 @@ def create_secret(
     
     secret = Secret(
         secret_key=secret_key,
-        encrypted_data=encrypted_data,
+        encrypted_data=None if content else encrypted_data,
+        content=content,
         passphrase_hash=passphrase_hash,
         expires_at=expires_at
     )
@@ -58,6 +67,7 @@ def create_secret(
     
     ttl_seconds = secret_data.ttl_seconds or 86400
     cache.set_cache(secret_key, cache_data, ttl_seconds)
+    expiry.schedule(secret_key, expires_at)
     
     log.info(f"Секрет сохранен в кеше и БД: {secret_key}")
     
@@ -72,6 +82,7 @@ def create_secret(
     return SecretResponse(secret_key=secret_key)
 
 
+@traced("secret_service.get_secret")
 def get_secret(
     db: Session,
     secret_key: str,
@@ -125,6 +136,7 @@ def get_secret(
         secret = db.query(Secret).filter(Secret.secret_key == secret_key).first()
         if secret:
             secret.is_accessed = True
+            dedup.release_content(db, secret)
             db.commit()
             log.info(f"БД обновлена, секрет {secret_key} помечен как прочитанный")
         
@@ -164,7 +176,7 @@ def get_secret(
         )
     
     try:
-        decrypted_data = crypto.decrypt_data(secret.encrypted_data)
+        decrypted_data = crypto.decrypt_data(secret.get_encrypted_data())
         log.info(f"Секрет {secret_key} успешно расшифрован (из БД)")
     except Exception as e:
         log.error(f"Ошибка при расшифровке секрета {secret_key} (из БД): {str(e)}")
@@ -174,6 +186,7 @@ def get_secret(
         )
     
     secret.is_accessed = True
+    dedup.release_content(db, secret)
     db.commit()
     log.info(f"БД обновлена, секрет {secret_key} помечен как прочитанный")
     
@@ -182,6 +195,7 @@ def get_secret(
     return SecretRead(secret=decrypted_data)
 
 
+@traced("secret_service.delete_secret")
 def delete_secret(
     db: Session,
     secret_key: str,
@@ -229,6 +243,7 @@ def delete_secret(
             )
     
     secret.is_deleted = True
+    dedup.release_content(db, secret)
     db.commit()
     
     logger.log_action(db, secret_key, ActionType.DELETE, request)
@@ -0,0 +1,70 @@
+"""Нагрузочный сценарий создания и чтения секретов.
+
+Запуск без внешних сервисов:
+    DATABASE_URL=sqlite:///./bench.db CACHE_BACKEND=memory AUDIT_SINK=memory \\
+        python -m benchmarks.api_load
+
+Тот же сценарий на стенде с Postgres и Redis:
+    DATABASE_URL=postgresql://... CACHE_BACKEND=redis REDIS_URL=redis://... \\
+        python -m benchmarks.api_load
+
+С --url запросы отправляются в уже запущенный сервис по HTTP.
+"""
+import argparse
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+
+PAYLOAD = '{"user": "ci", "token": "' + "x" * 256 + '"}'
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def run(client, iterations: int) -> Dict[str, List[float]]:
+    timings = {"create": [], "read": []}
+    for _ in range(iterations):
+        start = time.perf_counter()
+        response = client.post("/secret", json={"secret": PAYLOAD})
+        timings["create"].append(time.perf_counter() - start)
+        response.raise_for_status()
+        secret_key = response.json()["secret_key"]
+
+        start = time.perf_counter()
+        client.get(f"/secret/{secret_key}").raise_for_status()
+        timings["read"].append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--url", default=None, help="Адрес запущенного сервиса")
+    args = parser.parse_args()
+
+    if args.url:
+        client = httpx.Client(base_url=args.url)
+        print(f"target={args.url}")
+    else:
+        from fastapi.testclient import TestClient
+        from app.core.config import settings
+        from app.main import app
+        client = TestClient(app)
+        print(f"database={settings.DATABASE_URL.split('://')[0]} cache={settings.CACHE_BACKEND} "
+              f"audit_sink={settings.AUDIT_SINK}")
+
+    run(client, min(50, args.iterations))
+    timings = run(client, args.iterations)
+
+    for name, samples in timings.items():
+        print(f"{name:<7} ops_per_sec={len(samples) / sum(samples):>8.0f} "
+              f"p50_ms={statistics.median(samples) * 1000:>7.2f} "
+              f"p99_ms={percentile(samples, 0.99) * 1000:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Бенчмарк экспорта журнала аудита.
+
+Запуск: python -m benchmarks.audit_export [количество_строк]
+
+Заполняет временную SQLite-базу записями secret_logs, выгружает их
+в JSONL-файлы и печатает скорость экспорта и пиковый RSS процесса.
+"""
+import datetime
+import os
+import resource
+import sys
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base import Base
+from app.models.logs import SecretLog, ActionType
+from app.services.audit_export import export_logs
+
+DEFAULT_ROWS = 200_000
+INSERT_BATCH = 10_000
+
+
+def populate(engine, rows: int) -> None:
+    start = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    actions = list(ActionType)
+    with engine.begin() as conn:
+        for offset in range(0, rows, INSERT_BATCH):
+            conn.execute(insert(SecretLog), [
+                {
+                    "id": uuid.uuid4(),
+                    "secret_key": f"key-{i}",
+                    "action": actions[i % len(actions)],
+                    "ip_address": f"10.0.{i % 256}.{i % 100}",
+                    "user_agent": "benchmark/1.0",
+                    "additional_data": '{"ttl_seconds": 3600}',
+                    "created_at": start + datetime.timedelta(seconds=i),
+                    "updated_at": start + datetime.timedelta(seconds=i),
+                }
+                for i in range(offset, min(offset + INSERT_BATCH, rows))
+            ])
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        populate(engine, rows)
+
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        db = sessionmaker(bind=engine)()
+        start = time.perf_counter()
+        exported = export_logs(db, os.path.join(tmp_dir, "export"), "hour",
+                               until=datetime.datetime(2100, 1, 1, tzinfo=datetime.timezone.utc))
+        elapsed = time.perf_counter() - start
+        db.close()
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        files = os.listdir(os.path.join(tmp_dir, "export"))
+        print(f"rows={exported} files={len(files)} seconds={elapsed:.2f} "
+              f"rows_per_sec={exported / elapsed:.0f} max_rss_kb={rss_before}->{rss_after}")
+
+
+if __name__ == "__main__":
+    main()
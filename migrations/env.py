@@ -20,13 +20,10 @@ config = context.config
 # This line sets up loggers basically.
 fileConfig(config.config_file_name)
 
-# Добавление URL базы данных из переменных окружения
-section = config.config_ini_section
-config.set_section_option(section, "POSTGRES_USER", os.environ.get("POSTGRES_USER", "postgres"))
-config.set_section_option(section, "POSTGRES_PASSWORD", os.environ.get("POSTGRES_PASSWORD", "postgres"))
-config.set_section_option(section, "POSTGRES_HOST", os.environ.get("POSTGRES_HOST", "localhost"))
-config.set_section_option(section, "POSTGRES_PORT", os.environ.get("POSTGRES_PORT", "5432"))
-config.set_section_option(section, "POSTGRES_DB", os.environ.get("POSTGRES_DB", "secret_service"))
+# URL базы данных берется из настроек приложения, чтобы миграции
+# применялись к той же БД, что использует приложение (DATABASE_URL)
+from app.core.config import settings
+config.set_main_option("sqlalchemy.url", settings.DATABASE_URL.replace("%", "%%"))
 
 # add your model's MetaData object here
 # for 'autogenerate' support
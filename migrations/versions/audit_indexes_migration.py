@@ -0,0 +1,29 @@
+"""audit log composite indexes
+
+Revision ID: audit_indexes
+Revises: secret_contents
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'audit_indexes'
+down_revision = 'secret_contents'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Индексы строятся без блокировки записи в secret_logs
+    with op.get_context().autocommit_block():
+        op.create_index('ix_secret_logs_created_at_action', 'secret_logs', ['created_at', 'action'],
+                        unique=False, postgresql_concurrently=True)
+        op.create_index('ix_secret_logs_ip_address_created_at', 'secret_logs', ['ip_address', 'created_at'],
+                        unique=False, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_secret_logs_ip_address_created_at', table_name='secret_logs', postgresql_concurrently=True)
+        op.drop_index('ix_secret_logs_created_at_action', table_name='secret_logs', postgresql_concurrently=True)
@@ -0,0 +1,48 @@
+"""secret contents dedup store
+
+Revision ID: secret_contents
+Revises: initial
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'secret_contents'
+down_revision = 'initial'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('secret_contents',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('content_hash', sa.String(), nullable=False),
+    sa.Column('encrypted_data', sa.Text(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_secret_contents_content_hash'), 'secret_contents', ['content_hash'], unique=True)
+
+    op.add_column('secrets', sa.Column('content_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.create_foreign_key('fk_secrets_content_id', 'secrets', 'secret_contents', ['content_id'], ['id'])
+    op.create_index(op.f('ix_secrets_content_id'), 'secrets', ['content_id'], unique=False)
+    op.alter_column('secrets', 'encrypted_data', existing_type=sa.Text(), nullable=True)
+
+
+def downgrade():
+    op.execute(
+        "UPDATE secrets SET encrypted_data = secret_contents.encrypted_data "
+        "FROM secret_contents WHERE secrets.content_id = secret_contents.id"
+    )
+    op.execute("UPDATE secrets SET encrypted_data = '' WHERE encrypted_data IS NULL")
+    op.alter_column('secrets', 'encrypted_data', existing_type=sa.Text(), nullable=False)
+    op.drop_index(op.f('ix_secrets_content_id'), table_name='secrets')
+    op.drop_constraint('fk_secrets_content_id', 'secrets', type_='foreignkey')
+    op.drop_column('secrets', 'content_id')
+    op.drop_index(op.f('ix_secret_contents_content_hash'), table_name='secret_contents')
+    op.drop_table('secret_contents')
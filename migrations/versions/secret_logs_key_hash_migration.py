@@ -0,0 +1,65 @@
+"""secret_logs secret_key_hash
+
+Revision ID: secret_logs_key_hash
+Revises: secrets_expires_at_pending_index
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+import hashlib
+import hmac
+import os
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'secret_logs_key_hash'
+down_revision = 'secrets_expires_at_pending_index'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def hash_secret_key(mac_key: bytes, secret_key: str) -> str:
+    # Зафиксированная копия crypto.hash_secret_key: миграция не должна зависеть
+    # от текущего кода приложения
+    return hmac.new(mac_key, secret_key.encode(), hashlib.sha256).hexdigest()
+
+
+def upgrade():
+    op.add_column('secret_logs', sa.Column('secret_key_hash', sa.String(), nullable=True))
+    op.create_index(op.f('ix_secret_logs_secret_key_hash'), 'secret_logs', ['secret_key_hash'], unique=False)
+
+    # HMAC считается в Python, поэтому старые строки заполняются пакетами:
+    # ключи выбираются по индексу secret_key с продолжением после последнего
+    secret_key = os.environ.get("SECRET_KEY", "insecure_key_change_me")
+    mac_key = hmac.new(secret_key.encode(), b"secret-key-audit", hashlib.sha256).digest()
+    conn = op.get_bind()
+    last_key = ""
+    while True:
+        keys = conn.execute(sa.text(
+            "SELECT DISTINCT secret_key FROM secret_logs "
+            "WHERE secret_key > :after AND secret_key_hash IS NULL "
+            "ORDER BY secret_key LIMIT :limit"
+        ), {"after": last_key, "limit": BATCH_SIZE}).scalars().all()
+        if not keys:
+            break
+
+        params = {}
+        values = []
+        for i, key in enumerate(keys):
+            params[f"k{i}"] = key
+            params[f"h{i}"] = hash_secret_key(mac_key, key)
+            values.append(f"(:k{i}, :h{i})")
+        conn.execute(sa.text(
+            "UPDATE secret_logs AS l SET secret_key_hash = v.secret_key_hash "
+            f"FROM (VALUES {', '.join(values)}) AS v(secret_key, secret_key_hash) "
+            "WHERE l.secret_key = v.secret_key AND l.secret_key_hash IS NULL"
+        ), params)
+        last_key = keys[-1]
+
+
+def downgrade():
+    op.drop_index(op.f('ix_secret_logs_secret_key_hash'), table_name='secret_logs')
+    op.drop_column('secret_logs', 'secret_key_hash')
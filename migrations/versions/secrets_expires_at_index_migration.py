@@ -0,0 +1,25 @@
+"""secrets expires_at index
+
+Revision ID: secrets_expires_at_index
+Revises: audit_indexes
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'secrets_expires_at_index'
+down_revision = 'audit_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_secrets_expires_at'), 'secrets', ['expires_at'],
+                        unique=False, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_secrets_expires_at'), table_name='secrets', postgresql_concurrently=True)
@@ -0,0 +1,31 @@
+"""partial expires_at index for secrets with data
+
+Revision ID: secrets_expires_at_pending_index
+Revises: secrets_expires_at_index
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'secrets_expires_at_pending_index'
+down_revision = 'secrets_expires_at_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Стертые строки выпадают из индекса, и проходы планировщика не читают историю
+    with op.get_context().autocommit_block():
+        op.create_index('ix_secrets_expires_at_pending', 'secrets', ['expires_at'], unique=False,
+                        postgresql_where=sa.text('encrypted_data IS NOT NULL OR content_id IS NOT NULL'),
+                        postgresql_concurrently=True)
+        op.drop_index(op.f('ix_secrets_expires_at'), table_name='secrets', postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_secrets_expires_at'), 'secrets', ['expires_at'],
+                        unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_secrets_expires_at_pending', table_name='secrets', postgresql_concurrently=True)
@@ -0,0 +1,6 @@
+import os
+
+# Тесты не требуют внешних сервисов: БД, кеш и аудит работают в памяти процесса
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("CACHE_BACKEND", "memory")
+os.environ.setdefault("AUDIT_SINK", "database")
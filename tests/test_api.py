@@ -1,40 +1,14 @@
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine, event
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+import datetime
 import json
+import uuid
 
-from app.db.session import get_db
+from app.db.session import SessionLocal
 from app.main import app
-from app.models.base import Base
-
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-@event.listens_for(engine, "connect")
-def set_sqlite_pragma(dbapi_connection, connection_record):
-    cursor = dbapi_connection.cursor()
-    cursor.execute("PRAGMA foreign_keys=ON")
-    cursor.close()
-
-Base.metadata.create_all(bind=engine)
-
-
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
-        yield db
-    finally:
-        db.close()
-
-
-app.dependency_overrides[get_db] = override_get_db
+from app.core.config import settings
+from app.models.secret import Secret, SecretContent
+from app.services import crypto, dedup
 
 client = TestClient(app)
 
@@ -118,4 +92,141 @@ def test_delete_secret_with_passphrase():
         content=json.dumps({"passphrase": "test_passphrase"})
     )
     assert delete_response.status_code == 200
-    assert delete_response.json() == {"status": "secret_deleted"} 
\ No newline at end of file
+    assert delete_response.json() == {"status": "secret_deleted"} 
+
+
+def test_dedup_shares_content_between_secrets(monkeypatch):
+    monkeypatch.setattr(settings, "DEDUP_ENABLED", True)
+    payload = {"secret": "shared_certificate_bundle"}
+    
+    first_key = client.post("/secret", json=payload).json()["secret_key"]
+    second_key = client.post("/secret", json=payload).json()["secret_key"]
+    
+    db = SessionLocal()
+    first = db.query(Secret).filter(Secret.secret_key == first_key).first()
+    second = db.query(Secret).filter(Secret.secret_key == second_key).first()
+    assert first.content_id is not None
+    assert first.content_id == second.content_id
+    assert first.encrypted_data is None
+    content_id = first.content_id
+    assert db.get(SecretContent, content_id).ref_count == 2
+    db.close()
+    
+    read_response = client.get(f"/secret/{first_key}")
+    assert read_response.json() == {"secret": "shared_certificate_bundle"}
+    
+    db = SessionLocal()
+    assert db.get(SecretContent, content_id).ref_count == 1
+    db.close()
+    
+    delete_response = client.delete(f"/secret/{second_key}")
+    assert delete_response.status_code == 200
+    
+    db = SessionLocal()
+    assert db.get(SecretContent, content_id) is None
+    db.close()
+
+
+
+AUDIT_TOKEN = "test_audit_token"
+AUDIT_HEADERS = {"Authorization": f"Bearer {AUDIT_TOKEN}"}
+
+
+def test_audit_filters_and_paginates(monkeypatch):
+    monkeypatch.setattr(settings, "AUDIT_API_TOKEN", AUDIT_TOKEN)
+    secret_keys = [
+        client.post("/secret", json={"secret": f"audit_secret_{i}"}).json()["secret_key"]
+        for i in range(3)
+    ]
+    client.get(f"/secret/{secret_keys[0]}")
+    
+    read_response = client.get(
+        "/audit",
+        params={"action": "read", "secret_key": secret_keys[0]},
+        headers=AUDIT_HEADERS
+    )
+    assert read_response.status_code == 200
+    items = read_response.json()["items"]
+    assert [item["action"] for item in items] == ["read"]
+    assert "secret_key" not in items[0]
+    assert secret_keys[0] not in read_response.text
+    
+    by_hash = client.get(
+        "/audit",
+        params={"secret_key_hash": items[0]["secret_key_hash"]},
+        headers=AUDIT_HEADERS
+    ).json()["items"]
+    assert sorted(item["action"] for item in by_hash) == ["create", "read"]
+    
+    seen = []
+    cursor = None
+    for _ in range(100):
+        params = {"action": "create", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/audit", params=params, headers=AUDIT_HEADERS).json()
+        seen.extend(item["secret_key_hash"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert len(seen) == len(set(seen))
+    assert {crypto.hash_secret_key(key) for key in secret_keys} <= set(seen)
+
+
+def test_audit_rejects_invalid_cursor(monkeypatch):
+    monkeypatch.setattr(settings, "AUDIT_API_TOKEN", AUDIT_TOKEN)
+    response = client.get("/audit", params={"cursor": "not-a-cursor"}, headers=AUDIT_HEADERS)
+    assert response.status_code == 400
+
+
+def test_audit_requires_operator_token(monkeypatch):
+    monkeypatch.setattr(settings, "AUDIT_API_TOKEN", AUDIT_TOKEN)
+    
+    assert client.get("/audit").status_code == 401
+    assert client.get("/audit", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    
+    monkeypatch.setattr(settings, "AUDIT_API_TOKEN", "")
+    assert client.get("/audit", headers=AUDIT_HEADERS).status_code == 503
+
+
+def test_dedup_release_is_idempotent(monkeypatch):
+    monkeypatch.setattr(settings, "DEDUP_ENABLED", True)
+    payload = {"secret": f"idempotent_release_payload-{uuid.uuid4().hex}"}
+    first_key = client.post("/secret", json=payload).json()["secret_key"]
+    client.post("/secret", json=payload)
+    
+    db = SessionLocal()
+    stale = SessionLocal()
+    first = db.query(Secret).filter(Secret.secret_key == first_key).first()
+    stale_first = stale.query(Secret).filter(Secret.secret_key == first_key).first()
+    content_id = first.content_id
+    
+    dedup.release_content(db, first)
+    db.commit()
+    dedup.release_content(stale, stale_first)
+    stale.commit()
+    
+    assert db.get(SecretContent, content_id, populate_existing=True).ref_count == 1
+    db.close()
+    stale.close()
+
+
+def test_collect_orphans_skips_fresh_and_referenced_content():
+    db = SessionLocal()
+    suffix = uuid.uuid4().hex
+    old = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=1)
+    orphan = SecretContent(id=uuid.uuid4(), content_hash=f"orphan-{suffix}", encrypted_data="x", ref_count=1, updated_at=old)
+    fresh = SecretContent(id=uuid.uuid4(), content_hash=f"fresh-{suffix}", encrypted_data="x", ref_count=1)
+    referenced = SecretContent(id=uuid.uuid4(), content_hash=f"referenced-{suffix}", encrypted_data="x", ref_count=1, updated_at=old)
+    db.add_all([orphan, fresh, referenced])
+    db.add(Secret(id=uuid.uuid4(), secret_key=f"orphan_test_key-{suffix}", content_id=referenced.id))
+    db.commit()
+    
+    # Проверяем только записи этого запуска: в БД могут остаться сироты прошлых
+    assert dedup.collect_orphans(db) >= 1
+    
+    remaining = {c.content_hash for c in db.query(SecretContent).filter(
+        SecretContent.content_hash.in_([f"orphan-{suffix}", f"fresh-{suffix}", f"referenced-{suffix}"])
+    )}
+    assert remaining == {f"fresh-{suffix}", f"referenced-{suffix}"}
+    db.close()
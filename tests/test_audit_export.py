@@ -0,0 +1,73 @@
+import datetime
+import gzip
+import json
+import uuid
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base import Base
+from app.models.logs import SecretLog, ActionType
+from app.services import crypto
+from app.services.audit_export import export_logs
+
+START = datetime.datetime(2024, 1, 1, 10, 0, tzinfo=datetime.timezone.utc)
+UNTIL = datetime.datetime(2024, 1, 2, tzinfo=datetime.timezone.utc)
+
+
+def make_session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'export.db'}")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def add_log(db, minutes: int) -> None:
+    db.add(SecretLog(
+        id=uuid.uuid4(),
+        secret_key=f"key-{minutes}",
+        secret_key_hash=crypto.hash_secret_key(f"key-{minutes}"),
+        action=ActionType.READ,
+        ip_address="127.0.0.1",
+        created_at=START + datetime.timedelta(minutes=minutes)
+    ))
+    db.commit()
+
+
+def test_export_rotates_by_window_and_resumes(tmp_path):
+    db = make_session(tmp_path)
+    for minutes in (0, 30, 90):
+        add_log(db, minutes)
+    output_dir = tmp_path / "export"
+    
+    assert export_logs(db, str(output_dir), "hour", until=UNTIL) == 3
+    
+    with gzip.open(output_dir / "secret_logs_20240101T10.jsonl.gz", "rt") as f:
+        content = f.read()
+    rows = [json.loads(line) for line in content.splitlines()]
+    assert [row["secret_key_hash"] for row in rows] == [crypto.hash_secret_key(k) for k in ("key-0", "key-30")]
+    # Ключ секрета дает доступ к непрочитанному секрету и не должен попадать в выгрузку
+    assert "secret_key" not in rows[0]
+    assert "key-0" not in content
+    assert rows[0]["action"] == "read"
+    assert (output_dir / "secret_logs_20240101T11.jsonl.gz").exists()
+    
+    assert export_logs(db, str(output_dir), "hour", until=UNTIL) == 0
+    
+    add_log(db, 150)
+    assert export_logs(db, str(output_dir), "hour", until=UNTIL) == 1
+    db.close()
+
+
+def test_export_resumes_mid_window_without_losing_rows(tmp_path):
+    db = make_session(tmp_path)
+    for minutes in (0, 70, 100):
+        add_log(db, minutes)
+    output_dir = tmp_path / "export"
+    
+    assert export_logs(db, str(output_dir), "hour", until=START + datetime.timedelta(minutes=90)) == 2
+    assert export_logs(db, str(output_dir), "hour", until=UNTIL) == 1
+    
+    with gzip.open(output_dir / "secret_logs_20240101T11.jsonl.gz", "rt") as f:
+        rows = [json.loads(line) for line in f]
+    assert [row["secret_key_hash"] for row in rows] == [crypto.hash_secret_key(k) for k in ("key-70", "key-100")]
+    db.close()
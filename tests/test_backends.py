@@ -0,0 +1,53 @@
+import json
+
+from app.models.logs import SecretLog, ActionType
+from app.services import cache, crypto, logger
+
+
+def test_memory_cache_backend_expires_entries(monkeypatch):
+    backend = cache.MemoryCacheBackend()
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    
+    backend.set("secret:a", "value", 10)
+    assert backend.get("secret:a") == "value"
+    
+    now[0] += 11
+    assert backend.get("secret:a") is None
+    assert "secret:a" not in backend.local_cache
+
+
+def test_file_audit_sink_appends_jsonl(tmp_path):
+    sink = logger.FileAuditSink(str(tmp_path / "audit" / "audit.jsonl"))
+    
+    for secret_key in ("first", "second"):
+        entry = SecretLog(
+            id="1",
+            secret_key=secret_key,
+            secret_key_hash=crypto.hash_secret_key(secret_key),
+            action=ActionType.CREATE,
+            created_at=logger.utcnow()
+        )
+        sink.write(None, entry)
+    
+    with open(tmp_path / "audit" / "audit.jsonl") as f:
+        content = f.read()
+    rows = [json.loads(line) for line in content.splitlines()]
+    assert [row["secret_key_hash"] for row in rows] == [crypto.hash_secret_key(k) for k in ("first", "second")]
+    assert "first" not in content
+    assert rows[0]["action"] == "create"
+
+
+def test_memory_audit_sink_is_bounded():
+    sink = logger.MemoryAuditSink(max_entries=2)
+    
+    for secret_key in ("a", "b", "c"):
+        sink.write(None, SecretLog(
+            id="1",
+            secret_key=secret_key,
+            secret_key_hash=crypto.hash_secret_key(secret_key),
+            action=ActionType.READ,
+            created_at=logger.utcnow()
+        ))
+    
+    assert [entry["secret_key_hash"] for entry in sink.entries] == [crypto.hash_secret_key(k) for k in ("b", "c")]
@@ -0,0 +1,39 @@
+import zlib
+
+import pytest
+
+from app.core.config import settings
+from app.services import crypto
+
+
+@pytest.fixture
+def compression(monkeypatch):
+    monkeypatch.setattr(settings, "COMPRESSION_ENABLED", True)
+    monkeypatch.setattr(settings, "COMPRESSION_MIN_SIZE", 64)
+
+
+def test_compressed_roundtrip(compression):
+    data = '{"key": "value"}' * 100
+    
+    encrypted = crypto.encrypt_data(data)
+    assert encrypted.startswith(crypto.COMPRESSED_PREFIX)
+    assert crypto.decrypt_data(encrypted) == data
+
+
+def test_small_payload_is_not_compressed(compression):
+    encrypted = crypto.encrypt_data("short")
+    assert not encrypted.startswith(crypto.COMPRESSED_PREFIX)
+    assert crypto.decrypt_data(encrypted) == "short"
+
+
+def test_uncompressed_rows_still_decrypt(compression):
+    legacy = crypto.fernet.encrypt(("legacy" * 100).encode()).decode()
+    assert crypto.decrypt_data(legacy) == "legacy" * 100
+
+
+def test_decompression_bomb_is_rejected(compression, monkeypatch):
+    monkeypatch.setattr(settings, "COMPRESSION_MAX_EXPANDED_SIZE", 1024)
+    bomb = crypto.COMPRESSED_PREFIX + crypto.fernet.encrypt(zlib.compress(b"0" * 1024 * 1024)).decode()
+    
+    with pytest.raises(ValueError):
+        crypto.decrypt_data(bomb)
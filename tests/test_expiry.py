@@ -0,0 +1,167 @@
+import datetime
+import threading
+import time
+import uuid
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.models.base import Base
+from app.models.secret import Secret, SecretContent
+from app.services import cache, dedup
+from app.services.expiry import ExpiryScheduler, TimingWheel, scrub_expired
+
+NOW = 1_700_000_000.0
+
+
+def test_timing_wheel_never_fires_early():
+    wheel = TimingWheel(tick_seconds=1, slots=10, now=NOW)
+    
+    assert wheel.add("a", NOW + 2.5)
+    assert not wheel.add("far", NOW + 60)
+    
+    assert wheel.advance(NOW + 2.9) == []
+    assert wheel.advance(NOW + 3) == ["a"]
+    assert wheel.size == 0
+
+
+def test_timing_wheel_catches_up_after_idle():
+    wheel = TimingWheel(tick_seconds=1, slots=10, now=NOW)
+    wheel.add("a", NOW + 1)
+    wheel.add("b", NOW + 9)
+    
+    assert sorted(wheel.advance(NOW + 100)) == ["a", "b"]
+
+
+def make_secret(db, seconds: int) -> str:
+    secret_key = f"key{seconds}"
+    db.add(Secret(
+        id=uuid.uuid4(),
+        secret_key=secret_key,
+        encrypted_data="ciphertext",
+        expires_at=datetime.datetime.fromtimestamp(NOW + seconds, datetime.timezone.utc)
+    ))
+    db.commit()
+    return secret_key
+
+
+def test_scheduler_evicts_cache_and_scrubs_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "EXPIRY_HORIZON_SECONDS", 60)
+    engine = create_engine(f"sqlite:///{tmp_path / 'expiry.db'}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    
+    db = session_factory()
+    expired_key = make_secret(db, -10)
+    soon_key = make_secret(db, 5)
+    far_key = make_secret(db, 3600)
+    cache.set_cache(soon_key, {"encrypted_data": "ciphertext"}, 3600)
+    
+    scheduler = ExpiryScheduler(session_factory)
+    scheduler.rebuild(NOW)
+    assert scheduler.wheel.size == 1
+    
+    late_key = make_secret(db, 20)
+    scheduler.schedule(late_key, datetime.datetime.fromtimestamp(NOW + 20, datetime.timezone.utc))
+    assert scheduler.wheel.size == 2
+    
+    assert scheduler.run_once(NOW + 6) == 1
+    assert cache.get_cache(soon_key) is None
+    
+    db.expire_all()
+    data = {s.secret_key: s.encrypted_data for s in db.query(Secret).all()}
+    assert data == {expired_key: None, soon_key: None, late_key: "ciphertext", far_key: "ciphertext"}
+    db.close()
+
+
+def test_sweep_evicts_cache_of_keys_missing_from_wheel(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "EXPIRY_HORIZON_SECONDS", 60)
+    monkeypatch.setattr(settings, "EXPIRY_MAX_PENDING", 1)
+    engine = create_engine(f"sqlite:///{tmp_path / 'expiry.db'}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    
+    db = session_factory()
+    expired_key = make_secret(db, -10)
+    cache.set_cache(expired_key, {"encrypted_data": "ciphertext"}, 3600)
+    
+    scheduler = ExpiryScheduler(session_factory)
+    scheduler.rebuild(NOW)
+    assert cache.get_cache(expired_key) is None
+    
+    # Колесо заполнено: ключ не попадает в него, но стирается проходом на ближайшем тике
+    first_key = make_secret(db, 5)
+    overflow_key = make_secret(db, 6)
+    for secret_key, seconds in ((first_key, 5), (overflow_key, 6)):
+        cache.set_cache(secret_key, {"encrypted_data": "ciphertext"}, 3600)
+        scheduler.schedule(secret_key, datetime.datetime.fromtimestamp(NOW + seconds, datetime.timezone.utc))
+    assert scheduler.wheel.size == 1
+    
+    scheduler.run_once(NOW + 7)
+    assert cache.get_cache(overflow_key) is None
+    assert scheduler.overflow_until is None
+    
+    db.expire_all()
+    assert db.query(Secret).filter(Secret.secret_key == overflow_key).one().encrypted_data is None
+    db.close()
+
+
+def test_scrub_and_read_release_content_once(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'expiry.db'}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    
+    db = session_factory()
+    content = SecretContent(id=uuid.uuid4(), content_hash="h", encrypted_data="ciphertext", ref_count=2)
+    db.add(content)
+    for secret_key, seconds in (("expired", -10), ("live", 3600)):
+        db.add(Secret(
+            id=uuid.uuid4(),
+            secret_key=secret_key,
+            content_id=content.id,
+            expires_at=datetime.datetime.fromtimestamp(NOW + seconds, datetime.timezone.utc)
+        ))
+    db.commit()
+    
+    reader = session_factory()
+    stale_expired = reader.query(Secret).filter(Secret.secret_key == "expired").first()
+    
+    now = datetime.datetime.fromtimestamp(NOW, datetime.timezone.utc)
+    assert scrub_expired(db, now, 100) == ["expired"]
+    assert scrub_expired(session_factory(), now, 100) == []
+    dedup.release_content(reader, stale_expired)
+    reader.commit()
+    
+    db.expire_all()
+    assert db.get(SecretContent, content.id).ref_count == 1
+    db.close()
+    reader.close()
+
+
+def test_scheduler_start_does_not_block_on_rebuild(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'expiry.db'}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    db = session_factory()
+    make_secret(db, -10)
+    
+    scheduler = ExpiryScheduler(session_factory)
+    rebuilt = threading.Event()
+    original_rebuild = scheduler.rebuild
+    
+    def slow_rebuild(now=None):
+        time.sleep(0.2)
+        original_rebuild(time.time())
+        rebuilt.set()
+    
+    monkeypatch.setattr(scheduler, "rebuild", slow_rebuild)
+    started = time.perf_counter()
+    scheduler.start()
+    assert time.perf_counter() - started < 0.1
+    
+    assert rebuilt.wait(5)
+    scheduler.stop()
+    db.expire_all()
+    assert db.query(Secret).first().encrypted_data is None
+    db.close()
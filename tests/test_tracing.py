@@ -0,0 +1,77 @@
+import json
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+from app.core import tracing
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_request_spans_are_exported(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "exporter", tracing.FileExporter(str(tmp_path / "traces.jsonl")))
+    trace_id = "0af7651916cd43dd8448eb211c80319c"
+    
+    response = client.post("/secret", json={"secret": "traced_secret"}, headers={"X-Trace-Id": trace_id})
+    assert response.status_code == 201
+    assert response.headers["X-Trace-Id"] == trace_id
+    
+    with open(tmp_path / "traces.jsonl") as f:
+        record = json.loads(f.readline())
+    spans = record["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    names = {span["name"] for span in spans}
+    assert {"POST /secret", "secret_service.create_secret", "crypto.encrypt", "cache.set", "db.query"} <= names
+    assert all(span["traceId"] == trace_id for span in spans)
+    
+    by_id = {span["spanId"]: span for span in spans}
+    encrypt = next(span for span in spans if span["name"] == "crypto.encrypt")
+    assert by_id[encrypt["parentSpanId"]]["name"] == "secret_service.create_secret"
+
+
+def test_invalid_trace_id_is_replaced():
+    assert tracing.Trace("not-hex").trace_id != "not-hex"
+
+
+def test_sampler_collects_stacks_of_slow_requests():
+    sampler = tracing.StackSampler(threshold_ms=0, interval_ms=1)
+    
+    sampler.start_request("slow")
+    sampler.start_request("waiting")
+    with sampler.running("slow"):
+        deadline = time.perf_counter() + 0.1
+        while time.perf_counter() < deadline:
+            pass
+    waiting = sampler.finish_request("waiting")
+    stacks = sampler.finish_request("slow")
+    
+    assert sum(stacks.values()) > 0
+    assert any("test_sampler_collects_stacks_of_slow_requests" in stack for stack in stacks)
+    # Запрос делит поток, но не исполнялся в нем: чужие стеки ему не достаются
+    assert not waiting
+
+
+def test_sampler_parks_without_active_requests():
+    sampler = tracing.StackSampler(threshold_ms=0, interval_ms=1)
+    sampler.start_request("request")
+    sampler.finish_request("request")
+    
+    deadline = time.perf_counter() + 1
+    while time.perf_counter() < deadline:
+        stack = tracing.fold_stack(sys._current_frames()[sampler.thread.ident])
+        if "wait (threading.py" in stack:
+            break
+        time.sleep(0.01)
+    assert "wait (threading.py" in stack
+
+
+def test_root_span_uses_route_template(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "exporter", tracing.FileExporter(str(tmp_path / "traces.jsonl")))
+    
+    client.get("/secret/some-secret-key")
+    
+    with open(tmp_path / "traces.jsonl") as f:
+        spans = json.loads(f.readline())["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    root = next(span for span in spans if "parentSpanId" not in span)
+    assert root["name"] == "GET /secret/{secret_key}"